@@ -10,11 +10,23 @@ To switch strategies, change the graph builder import.
 """
 
 import asyncio
+import functools
+import hashlib
+import io
+import json
+import os
+import sys
+from contextlib import AsyncExitStack
 from pathlib import Path
+from types import MappingProxyType
+from typing import TextIO
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
-from src.mcp_client import create_mcp_client
+from langchain_core.tools import BaseTool
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from mcp import ClientSession
+from src.mcp_client import close_session, get_session
 
 from planning import (
     create_react_graph,
@@ -26,12 +38,150 @@ from planning import (
 )
 
 
+EXPERIMENTS_ROOT = Path(__file__).resolve().parent.parent / "scg-experiments"
+
+# Checkpoints are kept on disk so threads, and answers reused through them,
+# survive across processes. SCG_CHECKPOINT_DB overrides the location.
+CHECKPOINT_DB = Path(
+    os.environ.get(
+        "SCG_CHECKPOINT_DB", Path(__file__).resolve().parent / "checkpoints.sqlite"
+    )
+)
+
+_CHECKPOINTER: AsyncSqliteSaver | None = None
+_CHECKPOINTER_STACK: AsyncExitStack | None = None
+_CHECKPOINTER_LOCK: asyncio.Lock | None = None
+
+GRAPH_BUILDERS = {
+    "react": create_react_graph,
+    "plan_solve": create_plan_solve_graph,
+    "reflexion": create_reflexion_graph,
+    "ada_planner": create_ada_planner_graph,
+    "lats": create_lats_graph,
+}
+
+# Strategy-specific initial state, merged into every run. List values are copied
+# per run so graph nodes never share a mutable default.
+STRATEGY_INITIAL_STATE = MappingProxyType(
+    {
+        "plan_solve": MappingProxyType({"plan": []}),
+        "reflexion": MappingProxyType(
+            {"draft_answer": "", "critique": "", "iteration": 0}
+        ),
+        "ada_planner": MappingProxyType(
+            {"current_plan": [], "completed_steps": [], "current_step_index": 0}
+        ),
+        "lats": MappingProxyType(
+            {
+                "candidates": [],
+                "scores": [],
+                "best_path": "",
+                "is_solved": False,
+                "iteration": 0,
+                "best_score_history": [],
+            }
+        ),
+    }
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_experiments_root() -> Path:
+    """Get the scg-experiments root, checking once that it exists."""
+    if not EXPERIMENTS_ROOT.exists():
+        raise FileNotFoundError(f"Could not find scg-experiments at {EXPERIMENTS_ROOT}")
+    return EXPERIMENTS_ROOT
+
+
+@functools.lru_cache(maxsize=1)
+def get_llm() -> ChatGoogleGenerativeAI:
+    """Get the shared chat model, constructing it on first use."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        temperature=0.1,
+        streaming=True,
+        disable_streaming=False,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def get_tools(session: ClientSession) -> list[BaseTool]:
+    """Get the SCG tools for a session, creating them once per session.
+
+    Every graph built for the session gets the same list, so the builders'
+    bind_tools_cached reuses a single tool binding for it.
+    """
+    return create_scg_tools(session)
+
+
+def _checkpointer_lock() -> asyncio.Lock:
+    """Get the checkpointer lock, creating it under the running event loop."""
+    global _CHECKPOINTER_LOCK
+
+    if _CHECKPOINTER_LOCK is None:
+        _CHECKPOINTER_LOCK = asyncio.Lock()
+    return _CHECKPOINTER_LOCK
+
+
+async def get_checkpointer() -> AsyncSqliteSaver:
+    """Get the shared checkpoint saver, opening CHECKPOINT_DB on first use."""
+    global _CHECKPOINTER, _CHECKPOINTER_STACK
+
+    async with _checkpointer_lock():
+        if _CHECKPOINTER is None:
+            exit_stack = AsyncExitStack()
+            _CHECKPOINTER = await exit_stack.enter_async_context(
+                AsyncSqliteSaver.from_conn_string(str(CHECKPOINT_DB))
+            )
+            _CHECKPOINTER_STACK = exit_stack
+        return _CHECKPOINTER
+
+
+async def close_checkpointer() -> None:
+    """Close the checkpoint database, if open."""
+    global _CHECKPOINTER, _CHECKPOINTER_STACK
+
+    async with _checkpointer_lock():
+        exit_stack, _CHECKPOINTER, _CHECKPOINTER_STACK = _CHECKPOINTER_STACK, None, None
+        if exit_stack is not None:
+            await exit_stack.aclose()
+
+
+@functools.lru_cache(maxsize=16)
+def get_graph(
+    strategy: str,
+    session: ClientSession,
+    checkpointer: AsyncSqliteSaver | None = None,
+):
+    """Get the compiled graph for a strategy, building it once per MCP session.
+
+    Graphs built with a checkpointer must be run with a thread_id.
+    """
+    if strategy not in GRAPH_BUILDERS:
+        raise ValueError(
+            f"Unknown strategy: {strategy}. Choose from: {list(GRAPH_BUILDERS.keys())}"
+        )
+
+    return GRAPH_BUILDERS[strategy](
+        get_llm(), get_tools(session), checkpointer=checkpointer
+    )
+
+
+def answer_thread_id(strategy: str, query: str, tools: list[BaseTool]) -> str:
+    """Derive the checkpoint thread for a query, so repeats land on the same thread."""
+    key = json.dumps([strategy, query, sorted(t.name for t in tools)])
+    return "answer-" + hashlib.sha256(key.encode()).hexdigest()
+
+
 async def run_agent(
     query: str,
     strategy: str = "react",
     data_path: str | None = None,
     code_path: str | None = None,
     verbosity: int = 0,
+    output: TextIO = sys.stdout,
+    thread_id: str | None = None,
+    reuse_answers: bool = False,
 ):
     """Run the code comprehension agent with the specified strategy.
 
@@ -41,91 +191,145 @@ async def run_agent(
         data_path: Path to SCG data directory (Ignored in MCP mode, server uses defaults)
         code_path: Path to source code directory (Ignored in MCP mode, server uses defaults)
         verbosity: Output verbosity level
+        output: Stream that progress and verbose output is written to
+        thread_id: Checkpoint thread to continue; runs on the same thread share
+            state, which is kept in CHECKPOINT_DB across processes
+        reuse_answers: Without a thread_id, answer a repeated query from its
+            checkpoint, resuming it if the earlier run was interrupted. Stored
+            answers never expire and are not tied to the model or the indexed
+            code, so only opt in while both stay the same
     """
 
-    experiments_root = Path(__file__).parent.parent / "scg-experiments"
+    experiments_root = get_experiments_root()
+
+    print(f" Connecting to MCP server in {experiments_root}...", file=output)
+
+    session = await get_session(experiments_root)
+    print(" Connected to MCP server.", file=output)
+
+    reuse = reuse_answers and thread_id is None
+    if reuse:
+        thread_id = answer_thread_id(strategy, query, get_tools(session))
+
+    checkpointer = await get_checkpointer() if thread_id is not None else None
+    graph = get_graph(strategy, session, checkpointer)
+    config = {"recursion_limit": 100}
+    if thread_id is not None:
+        config["configurable"] = {"thread_id": thread_id}
+
+    initial_state = {
+        "messages": [HumanMessage(content=query)],
+        "final_answer": None,
+        **{
+            key: list(value) if isinstance(value, list) else value
+            for key, value in STRATEGY_INITIAL_STATE.get(strategy, {}).items()
+        },
+    }
+
+    run_input = initial_state
+    if reuse:
+        snapshot = await graph.aget_state(config)
+        if snapshot.next:
+            print(" Resuming interrupted run.", file=output)
+            run_input = None
+        elif snapshot.values.get("final_answer") is not None:
+            print(" Reusing earlier answer.", file=output)
+            return snapshot.values["final_answer"]
+
+    final_state = None
+    async for mode, payload in graph.astream(
+        run_input,
+        stream_mode=["messages", "values", "custom"],
+        config=config,
+    ):
+        if mode == "values":
+            final_state = payload
+            continue
+
+        if mode == "custom":
+            print(payload, file=output)
+            continue
+
+        if verbosity == 0:
+            continue
+
+        message, _ = payload
+        parts = []
+        if message.type == "AIMessageChunk":
+            for tool_call in message.tool_call_chunks:
+                if tool_call.get("name"):
+                    parts.append(f"[Tool Call] {tool_call['name']}\n")
+                    if verbosity >= 2:
+                        parts.append(f"  Args: {tool_call.get('args') or {}}\n")
+        elif message.type == "ai":
+            for tool_call in message.tool_calls:
+                parts.append(f"[Tool Call] {tool_call.get('name', 'unknown')}\n")
+                if verbosity >= 2:
+                    parts.append(f"  Args: {tool_call.get('args', {})}\n")
+        elif message.type == "tool" and verbosity >= 3:
+            content = message.content
+            if not isinstance(content, str):
+                content = repr(content)
+            if len(content) > 500:
+                content = content[:500] + "..."
+            tool_name = getattr(message, "name", None) or "unknown"
+            parts.append(f"[Tool Result] {tool_name}:\n  {content}\n")
+
+        if parts:
+            output.write("".join(parts))
+
+    if final_state and final_state.get("final_answer") is not None:
+        return final_state["final_answer"]
+
+    return "No answer produced."
+
+
+async def run_queries(queries: list[str], **kwargs) -> list:
+    """Run independent queries concurrently over the shared MCP session.
+
+    Each run writes its progress to its own buffer, and the buffers are
+    flushed in query order once all runs finish so logs stay readable.
 
-    if not experiments_root.exists():
-        raise FileNotFoundError(f"Could not find scg-experiments at {experiments_root}")
-
-    print(f" Connecting to MCP server in {experiments_root}...")
-
-    async with create_mcp_client(experiments_root) as session:
-        print(" Connected to MCP server.")
-
-        tools = create_scg_tools(session)
+    Args:
+        queries: The user's questions about code
+        **kwargs: Forwarded to run_agent
 
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0.1,
+    Returns:
+        Final answers in the same order as queries
+    """
+    if kwargs.get("thread_id") is not None:
+        raise ValueError("run_queries cannot share one thread_id between queries")
+
+    # Open the shared session on this task: the stdio transport it enters must
+    # be exited by the same task, which a gather child would not be.
+    await get_session(get_experiments_root())
+
+    buffers = [io.StringIO() for _ in queries]
+    answers = await asyncio.gather(
+        *(
+            run_agent(query, output=buffer, **kwargs)
+            for query, buffer in zip(queries, buffers)
         )
+    )
+    for buffer in buffers:
+        sys.stdout.write(buffer.getvalue())
+    return answers
 
-        graph_builders = {
-            "react": create_react_graph,
-            "plan_solve": create_plan_solve_graph,
-            "reflexion": create_reflexion_graph,
-            "ada_planner": create_ada_planner_graph,
-            "lats": create_lats_graph,
-        }
-
-        if strategy not in graph_builders:
-            raise ValueError(
-                f"Unknown strategy: {strategy}. Choose from: {list(graph_builders.keys())}"
-            )
 
-        graph = graph_builders[strategy](llm, tools)
+async def shutdown() -> None:
+    """Stop the MCP server and drop the tools, result caches and graphs bound to it."""
+    await close_session()
+    await close_checkpointer()
+    get_graph.cache_clear()
+    get_tools.cache_clear()
 
-        initial_state = {
-            "messages": [HumanMessage(content=query)],
-            "final_answer": None,
-        }
 
-        if strategy == "plan_solve":
-            initial_state["plan"] = []
-        elif strategy == "reflexion":
-            initial_state.update({"draft_answer": "", "critique": "", "iteration": 0})
-        elif strategy == "ada_planner":
-            initial_state.update(
-                {"current_plan": [], "completed_steps": [], "current_step_index": 0}
-            )
-        elif strategy == "lats":
-            initial_state.update(
-                {"candidates": [], "scores": [], "best_path": "", "is_solved": False}
-            )
-
-        result = None
-        async for event in graph.astream(
-            initial_state, stream_mode="updates", config={"recursion_limit": 100}
-        ):
-            result = event
-
-            if verbosity >= 1:
-                for node_name, node_output in event.items():
-                    if "messages" in node_output:
-                        for message in node_output["messages"]:
-                            if hasattr(message, "tool_calls") and message.tool_calls:
-                                for tool_call in message.tool_calls:
-                                    tool_name = tool_call.get("name", "unknown")
-                                    print(f"[Tool Call] {tool_name}")
-                                    if verbosity >= 2:
-                                        args = tool_call.get("args", {})
-                                        print(f"  Args: {args}")
-
-                            if hasattr(message, "type") and message.type == "tool":
-                                if verbosity >= 3:
-                                    tool_name = getattr(message, "name", "unknown")
-                                    content = message.content
-                                    if len(str(content)) > 500:
-                                        content = str(content)[:500] + "..."
-                                    print(f"[Tool Result] {tool_name}:")
-                                    print(f"  {content}")
-
-        if result:
-            for node_output in result.values():
-                if isinstance(node_output, dict) and "final_answer" in node_output:
-                    return node_output["final_answer"]
-
-        return "No answer produced."
+async def run_once(query: str, **kwargs):
+    """Run the agent for a single query and shut down the MCP server afterwards."""
+    try:
+        return await run_agent(query, **kwargs)
+    finally:
+        await shutdown()
 
 
 def main():
@@ -136,7 +340,7 @@ def main():
     print("=" * 50)
 
     try:
-        final_answer = asyncio.run(run_agent(query, strategy="lats", verbosity=2))
+        final_answer = asyncio.run(run_once(query, strategy="lats", verbosity=2))
 
         print("\nFinal Answer:")
         print("=" * 50)
@@ -2,21 +2,31 @@
 AdaPlanner (Adaptive Planning) Framework using LangGraph.
 
 Graph Structure: Planner -> Executor <-> Tools -> Record -> Re-Planner cycle
-- Planner node: Creates initial plan
+- Planner node: Creates initial plan, optionally calling tools for step 1
 - Executor node: Invokes LLM to decide on tool calls for current step
-- Tools node: Executes tool calls
+- Tools node: Executes tool calls concurrently
 - Record node: Records step completion
 - Re-Planner node: Observes output, decides to continue/modify/finish
 - Conditional edges: Based on tool calls and re-planner decision
 """
 
 from typing import Literal
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, RemoveMessage, SystemMessage
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 
-from .base import AdaPlannerState
+from .base import (
+    AdaPlannerState,
+    bind_tools_cached,
+    execute_tool_calls,
+    has_tool_calls,
+    parse_plan_steps,
+    print_graph_if_debug,
+    report,
+)
 
 
 PLANNER_SYSTEM_PROMPT = """You are a strategic planner for code analysis tasks.
@@ -31,24 +41,32 @@ Example format:
 1. Search for classes related to "caching"
 2. Get dependencies of the main cache manager
 3. Read the source code of key methods
-4. Analyze the caching strategy used"""
+4. Analyze the caching strategy used
 
+If step 1 needs a tool, call it in the same response as the plan."""
 
-EXECUTOR_SYSTEM_PROMPT = """You are executing step {step_num} of a code analysis plan.
+
+EXECUTOR_SYSTEM_PROMPT = """You are executing one step of a code analysis plan.
+Execute ONLY the current step using the available tools. Be thorough but focused.
 
 The full plan is:
 {plan}
 
-Current step to execute: {current_step}
-
 Previously completed steps:
 {completed_steps}
 
-Execute ONLY the current step using the available tools. Be thorough but focused."""
+Current step to execute (step {step_num}): {current_step}"""
 
 
 REPLANNER_SYSTEM_PROMPT = """You are an adaptive planner reviewing the progress of a code analysis task.
 
+Based on the results below, decide what to do next. Respond with EXACTLY one of:
+1. "DECISION: CONTINUE" - if the plan is working and we should proceed to the next step
+2. "DECISION: MODIFY\nNEW_PLAN: [your revised plan as numbered list]" - if we need to change approach
+3. "DECISION: FINISHED\nANSWER: [your final answer]" - if we have enough information to answer
+
+Be decisive and practical.
+
 Original question: {question}
 
 Current plan:
@@ -57,14 +75,12 @@ Current plan:
 Completed steps and their results:
 {completed_info}
 
-Current step index: {current_index} of {total_steps}
+Current step index: {current_index} of {total_steps}"""
 
-Based on the results so far, decide what to do next. Respond with EXACTLY one of:
-1. "DECISION: CONTINUE" - if the plan is working and we should proceed to the next step
-2. "DECISION: MODIFY\nNEW_PLAN: [your revised plan as numbered list]" - if we need to change approach
-3. "DECISION: FINISHED\nANSWER: [your final answer]" - if we have enough information to answer
 
-Be decisive and practical."""
+def _format_plan(steps: list[str]) -> str:
+    """Render plan steps as a numbered list."""
+    return "\n".join(f"{i + 1}. {s}" for i, s in enumerate(steps))
 
 
 def create_graph(
@@ -73,6 +89,7 @@ def create_graph(
     planner_prompt: str = PLANNER_SYSTEM_PROMPT,
     executor_prompt: str = EXECUTOR_SYSTEM_PROMPT,
     replanner_prompt: str = REPLANNER_SYSTEM_PROMPT,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> StateGraph:
     """Create an AdaPlanner agent graph.
 
@@ -82,163 +99,148 @@ def create_graph(
         planner_prompt: System prompt for initial planning
         executor_prompt: System prompt for step execution
         replanner_prompt: System prompt for re-planning
+        checkpointer: Optional checkpoint saver that persists state per thread_id
 
     Returns:
         Compiled StateGraph ready for execution
     """
 
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = bind_tools_cached(llm, tools)
+
+    def step_messages(state: AdaPlannerState, plan: list[str], step_index: int) -> list:
+        """Build the opening executor messages for a plan step."""
+        current_step = plan[step_index]
+        system_msg = executor_prompt.format(
+            step_num=step_index + 1,
+            plan=state["plan_formatted"],
+            current_step=current_step,
+            completed_steps=state["completed_formatted"] or "None yet",
+        )
+        return [
+            SystemMessage(content=system_msg),
+            HumanMessage(content=f"Execute this step: {current_step}"),
+        ]
+
+    async def planner_node(state: AdaPlannerState) -> dict:
+        """Create the initial plan and seed the state read by later nodes.
 
-    def planner_node(state: AdaPlannerState) -> dict:
-        """Create the initial plan."""
-        messages = [SystemMessage(content=planner_prompt), *state.get("messages", [])]
+        The planner may already emit tool calls for step 1, which saves the
+        executor's first LLM round-trip.
+        """
+        original_question = next(
+            (m.content for m in state["messages"] if m.type == "human"), ""
+        )
+        messages = [SystemMessage(content=planner_prompt), *state["messages"]]
 
-        response = llm.invoke(messages)
+        response = await llm_with_tools.ainvoke(messages)
 
-        lines = response.content.strip().split("\n")
-        plan_steps = [
-            line.strip()
-            for line in lines
-            if line.strip()
-            and (line.strip()[0].isdigit() or line.strip().startswith("-"))
-        ]
+        plan_text = response.content
+        plan_steps = parse_plan_steps(plan_text)
+        if not plan_steps and response.tool_calls:
+            # A reply holding only tool calls has no plan; ask again without tools.
+            plan_text = (await llm.ainvoke(messages)).content
+            plan_steps = parse_plan_steps(plan_text)
 
-        print("=" * 50)
-        print("Initial Plan:")
-        for i, step in enumerate(plan_steps):
-            print(f"{i + 1}. {step}")
-        print("=" * 50)
+        report(
+            "\n".join(["=" * 50, "Initial Plan:", _format_plan(plan_steps), "=" * 50])
+        )
 
-        return {
+        current_plan = plan_steps or [plan_text or original_question]
+
+        update = {
             "messages": [response],
-            "current_plan": plan_steps if plan_steps else [response.content],
+            "original_question": original_question,
+            "current_plan": current_plan,
+            "plan_formatted": _format_plan(current_plan),
             "completed_steps": [],
+            "completed_formatted": "",
             "current_step_index": 0,
+            "last_ai_content": "",
         }
+        if response.tool_calls:
+            update["executor_messages"] = [
+                *step_messages(update, current_plan, 0),
+                response,
+            ]
+        return update
 
-    def executor_node(state: AdaPlannerState) -> dict:
+    async def executor_node(state: AdaPlannerState) -> dict:
         """Execute the current step."""
-        plan = state.get("current_plan", [])
-        step_index = state.get("current_step_index", 0)
-        completed = state.get("completed_steps", [])
-        executor_messages = state.get("executor_messages", [])
+        plan = state["current_plan"]
+        step_index = state["current_step_index"]
+        executor_messages = state["executor_messages"]
 
         if step_index >= len(plan):
-            return {"messages": []}
-
-        current_step = plan[step_index]
-
-        plan_formatted = "\n".join(f"{i + 1}. {s}" for i, s in enumerate(plan))
-        completed_formatted = "\n".join(completed) if completed else "None yet"
-
-        system_msg = executor_prompt.format(
-            step_num=step_index + 1,
-            plan=plan_formatted,
-            current_step=current_step,
-            completed_steps=completed_formatted,
-        )
+            return {}
 
+        new_messages = []
         if not executor_messages:
-            executor_messages = [
-                SystemMessage(content=system_msg),
-                HumanMessage(content=f"Execute this step: {current_step}"),
-            ]
+            new_messages = step_messages(state, plan, step_index)
 
-        response = llm_with_tools.invoke(executor_messages)
+        response = await llm_with_tools.ainvoke([*executor_messages, *new_messages])
 
         return {
             "messages": [response],
-            "executor_messages": executor_messages + [response],
+            "executor_messages": new_messages + [response],
+            "last_ai_content": response.content,
         }
 
-    async def tools_node(state: AdaPlannerState) -> dict:
-        """Execute tools and add results to executor_messages."""
-        from langchain_core.messages import ToolMessage
-
-        messages = state.get("messages", [])
-        executor_messages = state.get("executor_messages", [])
-
-        if not messages:
-            return {}
+    tools_by_name = {t.name: t for t in tools}
 
-        last_message = messages[-1]
-        if not hasattr(last_message, "tool_calls") or not last_message.tool_calls:
+    async def tools_node(state: AdaPlannerState) -> dict:
+        """Execute tools concurrently and add results to executor_messages."""
+        if not has_tool_calls(state):
             return {}
 
-        tool_results = []
-        for tool_call in last_message.tool_calls:
-            tool_fn = next((t for t in tools if t.name == tool_call["name"]), None)
-            if tool_fn:
-                try:
-                    result = await tool_fn.ainvoke(tool_call["args"])
-                    tool_msg = ToolMessage(
-                        content=str(result), tool_call_id=tool_call["id"]
-                    )
-                    tool_results.append(tool_msg)
-                except Exception as e:
-                    tool_msg = ToolMessage(
-                        content=f"Error: {str(e)}", tool_call_id=tool_call["id"]
-                    )
-                    tool_results.append(tool_msg)
+        tool_results = await execute_tool_calls(
+            state["messages"][-1].tool_calls, tools_by_name
+        )
 
-        return {
-            "messages": tool_results,
-            "executor_messages": executor_messages + tool_results,
-        }
+        return {"messages": tool_results, "executor_messages": tool_results}
 
     def record_step_node(state: AdaPlannerState) -> dict:
         """Record the completed step result after tool execution."""
-        plan = state.get("current_plan", [])
-        step_index = state.get("current_step_index", 0)
-        completed = state.get("completed_steps", [])
-        messages = state.get("messages", [])
+        plan = state["current_plan"]
+        step_index = state["current_step_index"]
+        completed = state["completed_steps"]
 
         if step_index >= len(plan):
             return {}
 
         current_step = plan[step_index]
-
-        last_ai_content = ""
-        for msg in reversed(messages):
-            if isinstance(msg, AIMessage):
-                last_ai_content = msg.content
-                break
+        last_ai_content = state["last_ai_content"]
 
         step_result = (
             f"Step {step_index + 1}: {current_step}\nResult: {last_ai_content}"
         )
 
+        completed_formatted = state["completed_formatted"]
+
         return {
             "completed_steps": completed + [step_result],
+            "completed_formatted": (
+                f"{completed_formatted}\n{step_result}"
+                if completed_formatted
+                else step_result
+            ),
             "current_step_index": step_index + 1,
-            "executor_messages": [],
+            "executor_messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)],
         }
 
-    def replanner_node(state: AdaPlannerState) -> dict:
+    async def replanner_node(state: AdaPlannerState) -> dict:
         """Decide whether to continue, modify plan, or finish."""
-        plan = state.get("current_plan", [])
-        completed = state.get("completed_steps", [])
-        step_index = state.get("current_step_index", 0)
-        messages = state.get("messages", [])
-
-        original_question = ""
-        for msg in messages:
-            if hasattr(msg, "content") and msg.type == "human":
-                original_question = msg.content
-                break
-
-        plan_formatted = "\n".join(f"{i + 1}. {s}" for i, s in enumerate(plan))
-        completed_formatted = "\n".join(completed) if completed else "None"
+        plan = state["current_plan"]
+        step_index = state["current_step_index"]
 
         system_msg = replanner_prompt.format(
-            question=original_question,
-            plan=plan_formatted,
-            completed_info=completed_formatted,
+            question=state["original_question"],
+            plan=state["plan_formatted"],
+            completed_info=state["completed_formatted"] or "None",
             current_index=step_index,
             total_steps=len(plan),
         )
 
-        response = llm.invoke(
+        response = await llm.ainvoke(
             [
                 SystemMessage(content=system_msg),
                 HumanMessage(content="What should we do next?"),
@@ -247,10 +249,7 @@ def create_graph(
 
         content = response.content
 
-        print("=" * 50)
-        print("Re-Planner Decision:")
-        print(content)
-        print("=" * 50)
+        report("\n".join(["=" * 50, "Re-Planner Decision:", content, "=" * 50]))
 
         if "DECISION: FINISHED" in content:
             answer_match = (
@@ -260,38 +259,30 @@ def create_graph(
             )
             return {"messages": [response], "final_answer": answer_match}
         elif "DECISION: MODIFY" in content and "NEW_PLAN:" in content:
-            new_plan_text = content.split("NEW_PLAN:")[-1].strip()
-            lines = new_plan_text.split("\n")
-            new_plan = [
-                line.strip()
-                for line in lines
-                if line.strip()
-                and (line.strip()[0].isdigit() or line.strip().startswith("-"))
-            ]
-            return {
-                "messages": [response],
-                "current_plan": new_plan if new_plan else plan,
-                "current_step_index": 0,
-            }
+            new_plan = parse_plan_steps(content.split("NEW_PLAN:")[-1])
+            update = {"messages": [response], "current_step_index": 0}
+            if new_plan:
+                update["current_plan"] = new_plan
+                update["plan_formatted"] = _format_plan(new_plan)
+            return update
         else:
             return {"messages": [response]}
 
+    def decide_planner_path(state: AdaPlannerState) -> Literal["tools", "executor"]:
+        """Run step 1's tool calls directly if the planner already made them."""
+        return "tools" if has_tool_calls(state) else "executor"
+
     def decide_executor_path(state: AdaPlannerState) -> Literal["tools", "record_step"]:
         """Determine whether executor needs to call tools or can record step."""
-        messages = state.get("messages", [])
-        if messages:
-            last_message = messages[-1]
-            if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-                return "tools"
-        return "record_step"
+        return "tools" if has_tool_calls(state) else "record_step"
 
     def should_continue(state: AdaPlannerState) -> Literal["executor", "__end__"]:
         """Determine next action based on re-planner decision."""
         if state.get("final_answer"):
             return "__end__"
 
-        plan = state.get("current_plan", [])
-        step_index = state.get("current_step_index", 0)
+        plan = state["current_plan"]
+        step_index = state["current_step_index"]
 
         if step_index < len(plan):
             return "executor"
@@ -308,7 +299,11 @@ def create_graph(
 
     graph.set_entry_point("planner")
 
-    graph.add_edge("planner", "executor")
+    graph.add_conditional_edges(
+        "planner",
+        decide_planner_path,
+        {"tools": "tools", "executor": "executor"},
+    )
 
     graph.add_conditional_edges(
         "executor",
@@ -324,6 +319,6 @@ def create_graph(
         "replanner", should_continue, {"executor": "executor", "__end__": END}
     )
 
-    workflow = graph.compile()
-    workflow.get_graph().print_ascii()
+    workflow = graph.compile(checkpointer=checkpointer)
+    print_graph_if_debug(workflow)
     return workflow
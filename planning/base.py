@@ -2,8 +2,17 @@
 Base types, utilities, and shared components for LangGraph planning frameworks.
 """
 
+import asyncio
+import json
+import os
+import re
+from collections import OrderedDict
 from typing import TypedDict, List, Optional, Annotated
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage, AIMessage, ToolMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langgraph.config import get_stream_writer
 from langgraph.graph import add_messages
 
 
@@ -31,29 +40,80 @@ class ReflexionState(BaseAgentState):
 class AdaPlannerState(BaseAgentState):
     """State for AdaPlanner with adaptive re-planning."""
 
+    original_question: str
     current_plan: List[str]
+    plan_formatted: str
     completed_steps: List[str]
+    completed_formatted: str
     current_step_index: int
-    executor_messages: List[BaseMessage]
+    executor_messages: Annotated[List[BaseMessage], add_messages]
+    last_ai_content: str
 
 
 class LATSState(BaseAgentState):
     """State for LATS (Best-of-N) framework."""
 
+    sketches: List[str]
     candidates: List[dict]
     scores: List[float]
     best_path: str
     is_solved: bool
-    current_candidate_index: int
+    iteration: int
+    best_score_history: List[float]
+    score_source: str
+
+
+# Keyed by object ids; each entry keeps its model and tools alive so the ids
+# cannot be reused by other objects while cached.
+_BOUND_LLMS: OrderedDict[tuple[int, ...], tuple] = OrderedDict()
+_BOUND_LLMS_SIZE = 8
+
+
+def bind_tools_cached(llm: BaseChatModel, tools: List[BaseTool]) -> Runnable:
+    """Bind tools to an LLM, reusing the binding for the same model and tools."""
+    key = (id(llm), *(id(t) for t in tools))
+    entry = _BOUND_LLMS.get(key)
+    if entry is None:
+        entry = (llm, tuple(tools), llm.bind_tools(tools))
+        _BOUND_LLMS[key] = entry
+        if len(_BOUND_LLMS) > _BOUND_LLMS_SIZE:
+            _BOUND_LLMS.popitem(last=False)
+    else:
+        _BOUND_LLMS.move_to_end(key)
+    return entry[2]
+
+
+_PLAN_STEP_RE = re.compile(r"\d|-")
+
+
+def parse_plan_steps(text: str) -> List[str]:
+    """Extract the numbered or bulleted lines of an LLM-written plan."""
+    return [
+        step
+        for step in (line.strip() for line in text.split("\n"))
+        if step and _PLAN_STEP_RE.match(step)
+    ]
+
+
+def print_graph_if_debug(workflow) -> None:
+    """Print the compiled graph as ASCII art when SCG_DEBUG_GRAPH is set."""
+    if os.environ.get("SCG_DEBUG_GRAPH"):
+        workflow.get_graph().print_ascii()
+
+
+def report(text: str) -> None:
+    """Emit progress text on the graph's "custom" stream.
+
+    Callers streaming with stream_mode "custom" decide where it is written,
+    so concurrent runs can keep their output apart.
+    """
+    get_stream_writer()(text)
 
 
 def has_tool_calls(state: BaseAgentState) -> bool:
     """Check if the last message contains tool calls."""
-    messages = state.get("messages", [])
-    if not messages:
-        return False
-    last_message = messages[-1]
-    return hasattr(last_message, "tool_calls") and len(last_message.tool_calls) > 0
+    messages = state.get("messages")
+    return bool(messages and getattr(messages[-1], "tool_calls", None))
 
 
 def get_last_ai_message(state: BaseAgentState) -> Optional[AIMessage]:
@@ -64,9 +124,75 @@ def get_last_ai_message(state: BaseAgentState) -> Optional[AIMessage]:
     return None
 
 
+MESSAGE_WINDOW = 20
+
+
+def window_messages(
+    messages: List[BaseMessage], window: int = MESSAGE_WINDOW
+) -> List[BaseMessage]:
+    """Keep everything up to the first question plus the last `window` messages.
+
+    A window that would start on ToolMessages is widened back to the AIMessage
+    that made those calls, so results are never sent without their calls. A
+    window of 0 or less keeps only the question.
+    """
+    start = next((i + 1 for i, m in enumerate(messages) if m.type == "human"), 0)
+    if window <= 0:
+        return messages[:start]
+    if len(messages) - start <= window:
+        return messages
+
+    cut = len(messages) - window
+    while cut > start and messages[cut].type == "tool":
+        cut -= 1
+    return [*messages[:start], *messages[cut:]]
+
+
 def format_tool_results(tool_messages: List[ToolMessage]) -> str:
     """Format tool results into a readable string."""
     results = []
     for msg in tool_messages:
         results.append(f"Tool: {msg.name}\nResult: {msg.content}")
     return "\n\n".join(results)
+
+
+async def execute_tool_calls(
+    tool_calls: List[dict], tools_by_name: dict[str, BaseTool]
+) -> List[ToolMessage]:
+    """Run tool calls concurrently and return their results in call order."""
+
+    async def run_one(tool_call: dict) -> ToolMessage:
+        tool_fn = tools_by_name.get(tool_call["name"])
+        if tool_fn is None:
+            content = f"Error: Unknown tool '{tool_call['name']}'"
+        else:
+            try:
+                result = await tool_fn.ainvoke(tool_call["args"])
+                content = (
+                    result
+                    if isinstance(result, str)
+                    else json.dumps(result, default=str)
+                )
+            except Exception as e:
+                content = f"Error: {str(e)}"
+        return ToolMessage(
+            content=content, name=tool_call["name"], tool_call_id=tool_call["id"]
+        )
+
+    tasks = [asyncio.create_task(run_one(tool_call)) for tool_call in tool_calls]
+    return list(await asyncio.gather(*tasks))
+
+
+def create_tool_node(tools: List[BaseTool]):
+    """Create an async graph node that executes the last message's tool calls in parallel."""
+    tools_by_name = {t.name: t for t in tools}
+
+    async def tool_node(state: BaseAgentState) -> dict:
+        last_message = state["messages"][-1]
+        return {
+            "messages": await execute_tool_calls(
+                last_message.tool_calls, tools_by_name
+            )
+        }
+
+    return tool_node
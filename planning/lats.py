@@ -1,26 +1,38 @@
 """
 LATS (Language Agent Tree Search) - Best-of-N Framework using LangGraph.
 
-Graph Structure: Generator -> Tool Executor -> Evaluator -> Selector cycle
-- Generator node: Generates N different candidate actions/thoughts
-- Tool Executor node: Executes one candidate's tool call at a time
+Graph Structure: Generator -> Evaluator -> Selector cycle
+- Generator node: Streams N different candidate actions/thoughts, starting
+  each candidate's tool call as soon as it is complete
+  (with a beam width: Sketch node drafts N approaches, Expand node turns the
+  top-K into tool calls, K shrinking with depth, and a Tool Executor node runs
+  them concurrently)
 - Evaluator node: Scores each candidate
 - Selector node: Picks best path, updates state
-- Conditional edge: is_solved -> END, else -> Generator
+- Conditional edges: evaluator answered -> END, else -> Selector;
+  is_solved -> END, else -> Generator
 """
 
+import asyncio
+import json
+import math
 from typing import Literal
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
-from .base import LATSState
+from .base import LATSState, execute_tool_calls
 
 
 GENERATOR_SYSTEM_PROMPT = """You are generating candidate approaches for a code analysis task.
-Generate {num_candidates} DIFFERENT approaches or tool calls to make progress on the task.
+Generate DIFFERENT approaches or tool calls to make progress on the task.
+For each candidate, describe the approach and give the tool to call with its arguments.
+
+Make the candidates diverse - try different tools, different search queries, different nodes to explore.
 
 Current context:
 {context}
@@ -28,58 +40,125 @@ Current context:
 Best path so far:
 {best_path}
 
-For each candidate, output in this format:
-CANDIDATE 1:
-Approach: [description of the approach]
-Tool: [tool_name]
-Args: [tool arguments as JSON]
+Generate {num_candidates} candidates."""
 
-CANDIDATE 2:
-Approach: [description]
-Tool: [tool_name]
-Args: [tool arguments as JSON]
 
-...and so on.
+SKETCH_SYSTEM_PROMPT = """You are sketching candidate approaches for a code analysis task.
+Propose DIFFERENT approaches to make progress on the task, one line each, without tool arguments.
+List the most promising approach first.
 
-Make the candidates diverse - try different tools, different search queries, different nodes to explore."""
+Make the approaches diverse - try different tools, different search queries, different nodes to explore.
 
+Current context:
+{context}
 
-EVALUATOR_SYSTEM_PROMPT = """You are evaluating candidate approaches for a code analysis task.
+Best path so far:
+{best_path}
 
-Original question: {question}
+Propose {num_candidates} approaches."""
 
-Here are the candidates with their executed results:
-{candidates_with_results}
+
+EXPAND_SYSTEM_PROMPT = """You are turning candidate approaches for a code analysis task into tool calls.
+For each approach, keep its description and give the tool to call with its arguments.
+Keep the approaches in the order given.
+
+Current context:
+{context}
+
+Approaches:
+{approaches}"""
+
+
+EVALUATOR_SYSTEM_PROMPT = """You are evaluating candidate approaches for a code analysis task.
 
 Score each candidate from 0.0 to 1.0 based on:
 - Relevance to the question
 - Quality of information obtained
 - Progress towards the answer
 
-Output your scores in this exact format:
-CANDIDATE 1: [score]
-CANDIDATE 2: [score]
-...
+Give one score per candidate, in order. Mark the task solved only if we have
+enough information to fully answer the question, and in that case also write the
+final answer from the results and the progress so far.
 
-Then add:
-BEST: [candidate number]
-SOLVED: [YES/NO] - YES only if we have enough information to fully answer the question"""
+Original question: {question}
+
+Progress so far:
+{best_path}
+
+Here are the candidates with their executed results:
+{candidates_with_results}"""
 
 
 SELECTOR_SYSTEM_PROMPT = """You are selecting the best path forward and synthesizing progress.
 
+If SOLVED, provide the final answer.
+Otherwise, update the best_path by adding a summary of what we learned.
+
 Best candidate result:
 {best_result}
 
 Previous best path:
-{previous_path}
-
-If SOLVED, provide the final answer.
-Otherwise, update the best_path by adding a summary of what we learned."""
+{previous_path}"""
 
 
 NUM_CANDIDATES = 3
 MAX_ITERATIONS = 5
+MIN_IMPROVEMENT = 0.02
+CONFIDENT_SCORE = 0.9
+SCORE_MARGIN = 0.05
+
+
+class Candidate(BaseModel):
+    """A candidate approach proposed by the generator."""
+
+    approach: str = Field(description="Description of the approach")
+    tool: str = Field(description="Name of the tool to call")
+    # A JSON string rather than a dict: an object schema without properties
+    # is not reliably accepted as a Gemini response schema.
+    args: str = Field(
+        description='Tool call arguments as a JSON object, e.g. {"query": "cache"}'
+    )
+
+    @field_validator("args")
+    @classmethod
+    def _args_object(cls, value: str) -> str:
+        if not isinstance(json.loads(value), dict):
+            raise ValueError("args must be a JSON object")
+        return value
+
+
+class GeneratorOutput(BaseModel):
+    """Candidates proposed for one search iteration."""
+
+    candidates: list[Candidate]
+
+
+class Sketches(BaseModel):
+    """One-line candidate approaches, to be ranked before expansion."""
+
+    approaches: list[str] = Field(
+        description="One-line description of each approach, most promising first"
+    )
+
+
+class Evaluation(BaseModel):
+    """Evaluator verdict over the executed candidates."""
+
+    scores: list[float] = Field(
+        description="Score from 0.0 to 1.0 for each candidate, in order"
+    )
+    solved: bool = Field(
+        description="Whether there is enough information to fully answer the question"
+    )
+    answer: str = Field(
+        default="", description="Final answer to the question if solved, else empty"
+    )
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    """Cosine similarity of two embedding vectors."""
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
 
 
 def create_graph(
@@ -87,9 +166,17 @@ def create_graph(
     tools: list[BaseTool],
     num_candidates: int = NUM_CANDIDATES,
     max_iterations: int = MAX_ITERATIONS,
+    min_improvement: float = MIN_IMPROVEMENT,
+    confident_score: float = CONFIDENT_SCORE,
     generator_prompt: str = GENERATOR_SYSTEM_PROMPT,
     evaluator_prompt: str = EVALUATOR_SYSTEM_PROMPT,
     selector_prompt: str = SELECTOR_SYSTEM_PROMPT,
+    beam_width: int | None = None,
+    sketch_prompt: str = SKETCH_SYSTEM_PROMPT,
+    expand_prompt: str = EXPAND_SYSTEM_PROMPT,
+    scorer: Embeddings | None = None,
+    score_margin: float = SCORE_MARGIN,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> StateGraph:
     """Create a LATS (Best-of-N) agent graph.
 
@@ -98,137 +185,266 @@ def create_graph(
         tools: List of available tools
         num_candidates: Number of candidates to generate per iteration
         max_iterations: Maximum search iterations
+        min_improvement: Stop once the best score improves by less than this
+            over the previous iteration
+        confident_score: Stop once the best score exceeds this
         generator_prompt: System prompt for candidate generation
         evaluator_prompt: System prompt for evaluation
         selector_prompt: System prompt for selection
+        beam_width: If set, sketch num_candidates one-line approaches first and
+            expand only the best into tool calls, keeping
+            max(1, int(beam_width * (1 - iteration / max_iterations))) of them
+        sketch_prompt: System prompt for sketching approaches (beam_width only)
+        expand_prompt: System prompt for expanding approaches (beam_width only)
+        scorer: Optional embeddings model that ranks candidates by similarity of
+            their results (or, with beam_width, their sketches) to the question.
+            The LLM evaluator then only runs when the top two scores are within
+            score_margin; since embeddings cannot tell whether the question is
+            solved, such iterations never stop early, and their scores are left
+            out of the min_improvement and confident_score checks.
+        score_margin: Minimum lead of the best embedding score over the runner-up
+        checkpointer: Optional checkpoint saver that persists state per thread_id
 
     Returns:
         Compiled StateGraph ready for execution
     """
 
-    llm_with_tools = llm.bind_tools(tools)
-    tool_node = ToolNode(tools)
-    iteration_counter = {"count": 0}
+    generator_llm = llm.with_structured_output(GeneratorOutput, include_raw=True)
+    # A plain JSON schema streams partial dicts, where the Pydantic parser would
+    # only yield once the whole output validates.
+    generator_stream = llm.with_structured_output(
+        GeneratorOutput.model_json_schema()
+    )
+    # include_raw keeps a missing or malformed verdict from raising.
+    evaluator_llm = llm.with_structured_output(Evaluation, include_raw=True)
 
-    def generator_node(state: LATSState) -> dict:
-        """Generate N candidate approaches."""
-        messages = state.get("messages", [])
-        best_path = state.get("best_path", "No progress yet")
+    sketch_llm = llm.with_structured_output(Sketches, include_raw=True)
 
-        context = "\n".join(
+    def recent_context(messages: list) -> str:
+        """Summarise the last few messages for the generator prompts."""
+        return "\n".join(
             f"{m.type}: {m.content[:200]}..."
             if len(m.content) > 200
             else f"{m.type}: {m.content}"
             for m in messages[-5:]
         )
 
+    def to_candidate(c: Candidate) -> dict:
+        """Convert a generated candidate into the dict kept in state."""
+        args = json.loads(c.args)
+        return {
+            "raw": (
+                f"Approach: {c.approach}\nTool: {c.tool}\n"
+                f"Args: {json.dumps(args)}"
+            ),
+            "tool": c.tool,
+            "args": args,
+            "result": None,
+        }
+
+    def candidate_key(c: Candidate) -> str:
+        """Identify a candidate by its tool call, ignoring the approach text."""
+        return json.dumps([c.tool, json.loads(c.args)], sort_keys=True)
+
+    def unique_candidates(generated: list[Candidate]) -> list[dict]:
+        """Convert candidates, dropping repeats of the same tool and args."""
+        seen = set()
+        candidates = []
+        for c in generated:
+            key = candidate_key(c)
+            if key not in seen:
+                seen.add(key)
+                candidates.append(to_candidate(c))
+        return candidates
+
+    def candidates_message(candidates: list[dict]) -> AIMessage:
+        """Render candidates as the generator's message in the conversation."""
+        return AIMessage(
+            content="\n\n".join(
+                f"CANDIDATE {i + 1}:\n{c['raw']}" for i, c in enumerate(candidates)
+            )
+        )
+
+    def candidate_tool_call(idx: int, candidate: dict) -> dict:
+        """Build the tool call for the candidate at idx."""
+        return {
+            "id": f"call_{idx}",
+            "name": candidate["tool"],
+            "args": candidate["args"],
+        }
+
+    def results_update(
+        candidates: list[dict],
+        indices: list[int],
+        tool_calls: list[dict],
+        tool_results: list,
+    ) -> dict:
+        """Write tool results back into the candidates at indices."""
+        updated_candidates = list(candidates)
+        for idx, result in zip(indices, tool_results):
+            updated_candidates[idx] = {
+                **updated_candidates[idx],
+                "result": str(result.content)[:500],
+            }
+
+        messages = []
+        if tool_calls:
+            messages = [AIMessage(content="", tool_calls=tool_calls), *tool_results]
+        return {"candidates": updated_candidates, "messages": messages}
+
+    tools_by_name = {t.name: t for t in tools}
+
+    async def generator_node(state: LATSState) -> dict:
+        """Generate N candidate approaches and execute their tool calls.
+
+        Candidates are streamed, and each one's tool call starts as soon as the
+        next candidate begins, overlapping tool latency with generation.
+        """
         system_msg = generator_prompt.format(
-            num_candidates=num_candidates, context=context, best_path=best_path
+            num_candidates=num_candidates,
+            context=recent_context(state.get("messages", [])),
+            best_path=state.get("best_path", "No progress yet"),
         )
 
-        response = llm.invoke(
+        candidates, indices, tool_calls, pending = [], [], [], []
+        seen = set()
+
+        def start(item: dict) -> None:
+            try:
+                generated = Candidate.model_validate(item)
+            except ValidationError:
+                return
+            key = candidate_key(generated)
+            if key in seen:
+                return
+            seen.add(key)
+            candidate = to_candidate(generated)
+            candidates.append(candidate)
+            if candidate["tool"]:
+                idx = len(candidates) - 1
+                tool_call = candidate_tool_call(idx, candidate)
+                indices.append(idx)
+                tool_calls.append(tool_call)
+                pending.append(
+                    asyncio.create_task(
+                        execute_tool_calls([tool_call], tools_by_name)
+                    )
+                )
+
+        items, started = [], 0
+        try:
+            async for partial in generator_stream.astream(
+                [
+                    SystemMessage(content=system_msg),
+                    HumanMessage(content="Generate diverse candidate approaches."),
+                ]
+            ):
+                items = (partial or {}).get("candidates") or []
+                # An item is complete once the one after it has started.
+                while started < len(items) - 1 and len(candidates) < num_candidates:
+                    start(items[started])
+                    started += 1
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        while started < len(items) and len(candidates) < num_candidates:
+            start(items[started])
+            started += 1
+
+        tool_results = [results[0] for results in await asyncio.gather(*pending)]
+        update = results_update(candidates, indices, tool_calls, tool_results)
+        update["messages"] = [candidates_message(candidates), *update["messages"]]
+        return update
+
+    async def sketch_node(state: LATSState) -> dict:
+        """Sketch N one-line approaches without tool arguments."""
+        system_msg = sketch_prompt.format(
+            num_candidates=num_candidates,
+            context=recent_context(state.get("messages", [])),
+            best_path=state.get("best_path", "No progress yet"),
+        )
+
+        output = await sketch_llm.ainvoke(
             [
                 SystemMessage(content=system_msg),
-                HumanMessage(content="Generate diverse candidate approaches."),
+                HumanMessage(content="Sketch diverse candidate approaches."),
             ]
         )
 
-        content = response.content
-        candidates = []
-
-        parts = content.split("CANDIDATE")[1:]
-        for part in parts[:num_candidates]:
-            candidates.append(
-                {"raw": part.strip(), "tool": None, "args": None, "result": None}
-            )
+        # Unparsable sketches leave nothing to expand this iteration.
+        sketches = output["parsed"].approaches if output["parsed"] else []
+        return {"sketches": sketches[:num_candidates]}
 
-            lines = part.strip().split("\n")
-            for line in lines:
-                if line.startswith("Tool:"):
-                    candidates[-1]["tool"] = line.replace("Tool:", "").strip()
-                elif line.startswith("Args:"):
-                    try:
-                        import json
+    async def expand_node(state: LATSState) -> dict:
+        """Expand the top-K sketches into tool calls, shrinking K with depth."""
+        sketches = state.get("sketches", [])
+        if not sketches:
+            return {"candidates": []}
 
-                        args_str = line.replace("Args:", "").strip()
-                        candidates[-1]["args"] = json.loads(args_str)
-                    except:
-                        pass
+        iteration = state.get("iteration", 0)
+        width = max(1, int(beam_width * (1 - iteration / max_iterations)))
 
-        return {
-            "candidates": candidates,
-            "current_candidate_index": 0,
-            "messages": [response],
-        }
-
-    def execute_candidate_node(state: LATSState) -> dict:
-        """Execute current candidate's tool call using LLM with tools."""
-        candidates = state.get("candidates", [])
-        current_idx = state.get("current_candidate_index", 0)
-
-        if current_idx >= len(candidates):
-            return {}
+        if scorer is not None and len(sketches) > width:
+            question = next(
+                (m.content for m in state.get("messages", []) if m.type == "human"), ""
+            )
+            question_emb, sketch_embs = await asyncio.gather(
+                scorer.aembed_query(question), scorer.aembed_documents(sketches)
+            )
+            ranked = sorted(
+                zip(sketches, sketch_embs),
+                key=lambda pair: _cosine(question_emb, pair[1]),
+                reverse=True,
+            )
+            sketches = [sketch for sketch, _ in ranked]
 
-        candidate = candidates[current_idx]
+        system_msg = expand_prompt.format(
+            context=recent_context(state.get("messages", [])),
+            approaches="\n".join(
+                f"{i + 1}. {sketch}" for i, sketch in enumerate(sketches[:width])
+            ),
+        )
 
-        if candidate["tool"] and candidate["args"]:
-            tool_call = {
-                "id": f"call_{current_idx}",
-                "name": candidate["tool"],
-                "args": candidate["args"],
-            }
-            ai_msg = AIMessage(content="", tool_calls=[tool_call])
-            return {"messages": [ai_msg]}
+        output = await generator_llm.ainvoke(
+            [
+                SystemMessage(content=system_msg),
+                HumanMessage(content="Give the tool call for each approach."),
+            ]
+        )
 
-        return {"current_candidate_index": current_idx + 1}
+        generated = output["parsed"].candidates if output["parsed"] else []
+        candidates = unique_candidates(generated)[:width]
+        return {"candidates": candidates, "messages": [candidates_message(candidates)]}
 
-    def process_tool_result_node(state: LATSState) -> dict:
-        """Process the tool result and update the candidate."""
+    async def execute_candidates_node(state: LATSState) -> dict:
+        """Execute every candidate's tool call concurrently."""
         candidates = state.get("candidates", [])
-        current_idx = state.get("current_candidate_index", 0)
-        messages = state.get("messages", [])
 
-        if current_idx >= len(candidates):
+        runnable = [i for i, c in enumerate(candidates) if c["tool"]]
+        if not runnable:
             return {}
 
-        result_content = "No result"
-        for msg in reversed(messages):
-            if isinstance(msg, ToolMessage):
-                result_content = str(msg.content)[:500]
-                break
-
-        updated_candidates = list(candidates)
-        updated_candidates[current_idx] = {
-            **updated_candidates[current_idx],
-            "result": result_content,
-        }
-
-        return {
-            "candidates": updated_candidates,
-            "current_candidate_index": current_idx + 1,
-        }
+        tool_calls = [candidate_tool_call(i, candidates[i]) for i in runnable]
+        tool_results = await execute_tool_calls(tool_calls, tools_by_name)
 
-    def decide_candidate_path(state: LATSState) -> Literal["tools", "next_candidate"]:
-        """Determine if we need to execute a tool for current candidate."""
-        messages = state.get("messages", [])
-        if messages:
-            last_message = messages[-1]
-            if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-                return "tools"
-        return "next_candidate"
-
-    def should_continue_candidates(
-        state: LATSState,
-    ) -> Literal["execute_candidate", "evaluator"]:
-        """Check if there are more candidates to process."""
-        candidates = state.get("candidates", [])
-        current_idx = state.get("current_candidate_index", 0)
+        return results_update(candidates, runnable, tool_calls, tool_results)
 
-        if current_idx < len(candidates):
-            return "execute_candidate"
-        return "evaluator"
+    async def embedding_scores(question: str, candidates: list[dict]) -> list[float]:
+        """Score candidates by similarity of their results to the question."""
+        results = [c.get("result") for c in candidates]
+        question_emb, result_embs = await asyncio.gather(
+            scorer.aembed_query(question),
+            scorer.aembed_documents([r for r in results if r]),
+        )
+        result_embs = iter(result_embs)
+        return [
+            max(_cosine(question_emb, next(result_embs)), 0.0) if r else 0.0
+            for r in results
+        ]
 
-    def evaluator_node(state: LATSState) -> dict:
+    async def evaluator_node(state: LATSState) -> dict:
         """Score each candidate."""
         candidates = state.get("candidates", [])
         messages = state.get("messages", [])
@@ -239,6 +455,16 @@ def create_graph(
                 question = msg.content
                 break
 
+        if scorer is not None and candidates:
+            scores = await embedding_scores(question, candidates)
+            ranked = sorted(scores, reverse=True)
+            if len(ranked) < 2 or ranked[0] - ranked[1] >= score_margin:
+                return {
+                    "scores": scores,
+                    "is_solved": False,
+                    "score_source": "embedding",
+                }
+
         candidates_text = []
         for i, c in enumerate(candidates):
             result_text = c.get("result", "No result") or "No result"
@@ -247,43 +473,61 @@ def create_graph(
             )
 
         system_msg = evaluator_prompt.format(
-            question=question, candidates_with_results="\n\n".join(candidates_text)
+            question=question,
+            best_path=state.get("best_path") or "No progress yet",
+            candidates_with_results="\n\n".join(candidates_text),
         )
 
-        response = llm.invoke(
+        output = await evaluator_llm.ainvoke(
             [
                 SystemMessage(content=system_msg),
                 HumanMessage(content="Evaluate and score the candidates."),
             ]
         )
+        # Without a parsable verdict every candidate scores 0.5, unsolved.
+        evaluation = output["parsed"] or Evaluation(scores=[], solved=False)
 
-        content = response.content
+        scores = [
+            min(max(score, 0.0), 1.0) for score in evaluation.scores[: len(candidates)]
+        ]
+        scores += [0.5] * (len(candidates) - len(scores))
 
-        scores = []
-        for line in content.split("\n"):
-            if line.strip().startswith("CANDIDATE") and ":" in line:
-                try:
-                    score_part = line.split(":")[-1].strip()
-                    score = float(score_part.split()[0])
-                    scores.append(min(max(score, 0.0), 1.0))
-                except:
-                    scores.append(0.5)
-
-        while len(scores) < len(candidates):
-            scores.append(0.5)
-
-        is_solved = "SOLVED: YES" in content.upper()
+        response = AIMessage(
+            content="\n".join(
+                f"CANDIDATE {i + 1}: {score}" for i, score in enumerate(scores)
+            )
+            + f"\nSOLVED: {'YES' if evaluation.solved else 'NO'}"
+        )
 
-        return {"scores": scores, "is_solved": is_solved, "messages": [response]}
+        update = {
+            "scores": scores,
+            "is_solved": evaluation.solved,
+            "score_source": "llm",
+            "messages": [response],
+        }
+        # A confident verdict already carries the answer, so the selector's
+        # synthesis call can be skipped.
+        if evaluation.solved and evaluation.answer:
+            update["final_answer"] = evaluation.answer
+        return update
 
-    def selector_node(state: LATSState) -> dict:
+    async def selector_node(state: LATSState) -> dict:
         """Select best candidate and update path."""
         candidates = state.get("candidates", [])
         scores = state.get("scores", [])
         best_path = state.get("best_path", "")
         is_solved = state.get("is_solved", False)
-
-        iteration_counter["count"] += 1
+        iteration = state.get("iteration", 0) + 1
+        history = state.get("best_score_history", [])
+
+        # Cosine similarities are not on the LLM's 0-1 scale, so only LLM
+        # scores feed the plateau and confidence checks.
+        if scores and state.get("score_source") != "embedding":
+            history = history + [max(scores)]
+        plateaued = bool(history) and (
+            history[-1] > confident_score
+            or (len(history) >= 2 and history[-1] - history[-2] < min_improvement)
+        )
 
         if candidates and scores:
             best_idx = scores.index(max(scores))
@@ -296,7 +540,7 @@ def create_graph(
             best_result=best_result[:500], previous_path=best_path
         )
 
-        response = llm.invoke(
+        response = await llm.ainvoke(
             [
                 SystemMessage(content=system_msg),
                 HumanMessage(
@@ -305,19 +549,25 @@ def create_graph(
             ]
         )
 
-        new_path = (
-            best_path
-            + f"\n\nIteration {iteration_counter['count']}: {response.content[:300]}"
-        )
+        new_path = best_path + f"\n\nIteration {iteration}: {response.content[:300]}"
 
-        result = {"best_path": new_path, "messages": [response]}
+        result = {
+            "best_path": new_path,
+            "iteration": iteration,
+            "best_score_history": history,
+            "messages": [response],
+        }
 
-        if is_solved or iteration_counter["count"] >= max_iterations:
+        if is_solved or plateaued or iteration >= max_iterations:
             result["final_answer"] = response.content
             result["is_solved"] = True
 
         return result
 
+    def after_evaluation(state: LATSState) -> Literal["selector", "__end__"]:
+        """End as soon as the evaluator has answered the question."""
+        return "__end__" if state.get("final_answer") else "selector"
+
     def should_continue(state: LATSState) -> Literal["generator", "__end__"]:
         """Check if we should continue searching."""
         if state.get("is_solved") or state.get("final_answer"):
@@ -326,35 +576,32 @@ def create_graph(
 
     graph = StateGraph(LATSState)
 
-    graph.add_node("generator", generator_node)
-    graph.add_node("execute_candidate", execute_candidate_node)
-    graph.add_node("tools", tool_node)
-    graph.add_node("process_result", process_tool_result_node)
+    # With a beam, candidates are sketched and ranked before being expanded.
+    first_node = "generator" if beam_width is None else "sketch"
+    if beam_width is None:
+        graph.add_node("generator", generator_node)
+    else:
+        graph.add_node("sketch", sketch_node)
+        graph.add_node("expand", expand_node)
+        graph.add_node("execute_candidates", execute_candidates_node)
     graph.add_node("evaluator", evaluator_node)
     graph.add_node("selector", selector_node)
 
-    graph.set_entry_point("generator")
+    graph.set_entry_point(first_node)
 
-    graph.add_edge("generator", "execute_candidate")
+    if beam_width is None:
+        graph.add_edge("generator", "evaluator")
+    else:
+        graph.add_edge("sketch", "expand")
+        graph.add_edge("expand", "execute_candidates")
+        graph.add_edge("execute_candidates", "evaluator")
 
     graph.add_conditional_edges(
-        "execute_candidate",
-        decide_candidate_path,
-        {"tools": "tools", "next_candidate": "process_result"},
+        "evaluator", after_evaluation, {"selector": "selector", "__end__": END}
     )
 
-    graph.add_edge("tools", "process_result")
-
-    graph.add_conditional_edges(
-        "process_result",
-        should_continue_candidates,
-        {"execute_candidate": "execute_candidate", "evaluator": "evaluator"},
-    )
-
-    graph.add_edge("evaluator", "selector")
-
     graph.add_conditional_edges(
-        "selector", should_continue, {"generator": "generator", "__end__": END}
+        "selector", should_continue, {"generator": first_node, "__end__": END}
     )
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
@@ -10,10 +10,16 @@ Graph Structure: Planner -> Executor -> END
 from langchain_core.messages import SystemMessage
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
 
-from .base import PlanningState
+from .base import (
+    PlanningState,
+    bind_tools_cached,
+    create_tool_node,
+    parse_plan_steps,
+)
 
 
 PLANNER_SYSTEM_PROMPT = """You are a planning assistant for code analysis tasks.
@@ -31,12 +37,11 @@ Do NOT execute the plan - only create it."""
 
 EXECUTOR_SYSTEM_PROMPT = """You are a code analysis executor with access to a Semantic Code Graph.
 You have been given a plan to follow. Execute each step using the available tools.
+Execute all steps systematically and synthesize the results into a comprehensive answer.
+When you have completed the plan and gathered enough information, provide your final answer.
 
 The plan is:
-{plan}
-
-Execute all steps systematically and synthesize the results into a comprehensive answer.
-When you have completed the plan and gathered enough information, provide your final answer."""
+{plan}"""
 
 
 def create_graph(
@@ -44,6 +49,7 @@ def create_graph(
     tools: list[BaseTool],
     planner_prompt: str = PLANNER_SYSTEM_PROMPT,
     executor_prompt: str = EXECUTOR_SYSTEM_PROMPT,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> StateGraph:
     """Create a Plan-and-Solve agent graph.
 
@@ -52,34 +58,29 @@ def create_graph(
         tools: List of tools for the executor
         planner_prompt: System prompt for planning
         executor_prompt: System prompt for execution
+        checkpointer: Optional checkpoint saver that persists state per thread_id
 
     Returns:
         Compiled StateGraph ready for execution
     """
 
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = bind_tools_cached(llm, tools)
 
-    def planner_node(state: PlanningState) -> dict:
+    async def planner_node(state: PlanningState) -> dict:
         """Generate a complete plan for the task."""
         messages = [SystemMessage(content=planner_prompt), *state["messages"]]
 
-        response = llm.invoke(messages)
+        response = await llm.ainvoke(messages)
 
         plan_text = response.content
-        lines = plan_text.strip().split("\n")
-        plan_steps = [
-            line.strip()
-            for line in lines
-            if line.strip()
-            and (line.strip()[0].isdigit() or line.strip().startswith("-"))
-        ]
+        plan_steps = parse_plan_steps(plan_text)
 
         return {
             "messages": [response],
             "plan": plan_steps if plan_steps else [plan_text],
         }
 
-    def executor_node(state: PlanningState) -> dict:
+    async def executor_node(state: PlanningState) -> dict:
         """Execute the plan using tools."""
         plan = state.get("plan", "")
 
@@ -87,17 +88,15 @@ def create_graph(
 
         messages = [SystemMessage(content=executor_system), *state["messages"]]
 
-        response = llm_with_tools.invoke(messages)
+        response = await llm_with_tools.ainvoke(messages)
 
         return {"messages": [response], "final_answer": response.content}
 
-    tool_node_instance = ToolNode(tools)
-
     graph = StateGraph(PlanningState)
 
     graph.add_node("planner", planner_node)
     graph.add_node("executor", executor_node)
-    graph.add_node("tools", tool_node_instance)
+    graph.add_node("tools", create_tool_node(tools))
 
     graph.set_entry_point("planner")
 
@@ -109,4 +108,4 @@ def create_graph(
 
     graph.add_edge("tools", "executor")
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
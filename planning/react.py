@@ -3,17 +3,26 @@ ReAct (Reasoning + Acting) Framework using LangGraph.
 
 Graph Structure: Agent <-> Tools cycle
 - Agent node: LLM decides to call a tool OR produce final answer
-- Tools node: Executes tool calls
+- Tools node: Executes tool calls concurrently
 - Conditional edge: has_tool_calls -> Tools, else -> END
 """
 
 from typing import Literal
+from langchain_core.messages import SystemMessage
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 
-from .base import BaseAgentState, has_tool_calls
+from .base import (
+    MESSAGE_WINDOW,
+    BaseAgentState,
+    bind_tools_cached,
+    create_tool_node,
+    has_tool_calls,
+    print_graph_if_debug,
+    window_messages,
+)
 
 
 REACT_SYSTEM_PROMPT = """You are a code analysis assistant with access to a Semantic Code Graph.
@@ -30,7 +39,11 @@ When you have enough information to answer the user's question, provide your fin
 
 
 def create_graph(
-    llm: BaseChatModel, tools: list[BaseTool], system_prompt: str = REACT_SYSTEM_PROMPT
+    llm: BaseChatModel,
+    tools: list[BaseTool],
+    system_prompt: str = REACT_SYSTEM_PROMPT,
+    message_window: int = MESSAGE_WINDOW,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> StateGraph:
     """Create a ReAct agent graph.
 
@@ -38,23 +51,27 @@ def create_graph(
         llm: Language model to use for reasoning
         tools: List of tools the agent can use
         system_prompt: System prompt for the agent
+        message_window: Number of recent messages sent to the LLM besides the question
+        checkpointer: Optional checkpoint saver that persists state per thread_id
 
     Returns:
         Compiled StateGraph ready for execution
     """
 
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = bind_tools_cached(llm, tools)
 
-    def agent_node(state: BaseAgentState) -> dict:
+    system_message = SystemMessage(content=system_prompt)
+
+    async def agent_node(state: BaseAgentState) -> dict:
         """Agent node that decides what to do next."""
-        messages = state["messages"]
+        messages = window_messages(state["messages"], message_window)
 
         if not any(m.type == "system" for m in messages):
-            from langchain_core.messages import SystemMessage
-
-            messages = [SystemMessage(content=system_prompt)] + list(messages)
+            messages = [system_message, *messages]
 
-        response = llm_with_tools.invoke(messages)
+        response = None
+        async for chunk in llm_with_tools.astream(messages):
+            response = chunk if response is None else response + chunk
 
         if not response.tool_calls:
             return {"messages": [response], "final_answer": response.content}
@@ -70,7 +87,7 @@ def create_graph(
     graph = StateGraph(BaseAgentState)
 
     graph.add_node("agent", agent_node)
-    graph.add_node("tools", ToolNode(tools))
+    graph.add_node("tools", create_tool_node(tools))
 
     graph.set_entry_point("agent")
 
@@ -79,6 +96,6 @@ def create_graph(
     )
     graph.add_edge("tools", "agent")
 
-    workflow = graph.compile()
-    workflow.get_graph().print_ascii()
+    workflow = graph.compile(checkpointer=checkpointer)
+    print_graph_if_debug(workflow)
     return workflow
@@ -7,31 +7,39 @@ Graph Structure: Actor <-> Critique cycle
 - Conditional edge: Good critique -> END, Bad -> loop to Actor
 """
 
+import re
 from typing import Literal
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.language_models import BaseChatModel
 from langchain_core.tools import BaseTool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-
-from .base import ReflexionState
+from .base import (
+    MESSAGE_WINDOW,
+    ReflexionState,
+    bind_tools_cached,
+    create_tool_node,
+    print_graph_if_debug,
+    report,
+    window_messages,
+)
 
 
 ACTOR_SYSTEM_PROMPT = """You are a code analysis assistant with access to a Semantic Code Graph.
 Your goal is to provide accurate and comprehensive answers about code.
-
-{critique_context}
-
 Use the available tools to gather information and provide a thorough answer.
 Think carefully and be precise in your analysis."""
 
 
+REVISION_PROMPT = """PREVIOUS ATTEMPT WAS INSUFFICIENT. Please improve based on this feedback:
+{critique}
+
+Try again with more thorough research and analysis."""
+
+
 CRITIQUE_SYSTEM_PROMPT = """You are a critical evaluator of code analysis answers.
 Your job is to assess whether an answer is complete, accurate, and helpful.
 
-Evaluate the following answer:
-{answer}
-
 Consider:
 1. Does it fully address the user's question?
 2. Is the information accurate based on the evidence gathered?
@@ -42,11 +50,22 @@ Respond with EXACTLY one of these formats:
 - If the answer is good: "VERDICT: GOOD"
 - If the answer needs improvement: "VERDICT: BAD\nFEEDBACK: [your specific feedback for improvement]"
 
-Be constructive in your feedback."""
+Be constructive in your feedback.
+
+Evaluate the following answer:
+{answer}"""
 
 
 MAX_ITERATIONS = 3
 
+_VERDICT_RE = re.compile(r"VERDICT:\s*(GOOD|BAD)", re.IGNORECASE)
+
+
+def _is_good(critique: str) -> bool:
+    """Whether a critique's VERDICT line accepts the answer."""
+    match = _VERDICT_RE.search(critique)
+    return bool(match) and match.group(1).upper() == "GOOD"
+
 
 def create_graph(
     llm: BaseChatModel,
@@ -54,6 +73,9 @@ def create_graph(
     actor_prompt: str = ACTOR_SYSTEM_PROMPT,
     critique_prompt: str = CRITIQUE_SYSTEM_PROMPT,
     max_iterations: int = MAX_ITERATIONS,
+    message_window: int = MESSAGE_WINDOW,
+    critique_llm: BaseChatModel | None = None,
+    checkpointer: BaseCheckpointSaver | None = None,
 ) -> StateGraph:
     """Create a Reflexion agent graph.
 
@@ -63,39 +85,35 @@ def create_graph(
         actor_prompt: System prompt for the actor
         critique_prompt: System prompt for the critique
         max_iterations: Maximum Actor-Critique loops
+        message_window: Number of recent messages sent to the actor besides the question
+        critique_llm: Model for the tool-less critique, e.g. a smaller, cheaper one;
+            defaults to llm
+        checkpointer: Optional checkpoint saver that persists state per thread_id
 
     Returns:
         Compiled StateGraph ready for execution
     """
 
-    llm_with_tools = llm.bind_tools(tools)
-    tool_node = ToolNode(tools)
+    llm_with_tools = bind_tools_cached(llm, tools)
+    if critique_llm is None:
+        critique_llm = llm
 
-    def actor_node(state: ReflexionState) -> dict:
-        """Generate or refine an answer based on critique."""
-        critique = state.get("critique", "")
-
-        critique_context = ""
-        if critique and "BAD" in critique:
-            critique_context = f"""
-PREVIOUS ATTEMPT WAS INSUFFICIENT. Please improve based on this feedback:
-{critique}
-
-Try again with more thorough research and analysis."""
-
-        system_msg = actor_prompt.format(critique_context=critique_context)
-        messages = list(state.get("messages", []))
+    # Built once so every actor call sends the same prefix; critique feedback
+    # is appended to the conversation instead of rewriting this message.
+    system_message = SystemMessage(content=actor_prompt)
 
+    async def actor_node(state: ReflexionState) -> dict:
+        """Generate or refine an answer based on critique."""
+        messages = state.get("messages", [])
         if messages and isinstance(messages[0], SystemMessage):
-            messages[0] = SystemMessage(content=system_msg)
-        else:
-            messages.insert(0, SystemMessage(content=system_msg))
+            messages = messages[1:]
+        messages = window_messages(messages, message_window)
 
-        response = llm_with_tools.invoke(messages)
+        response = await llm_with_tools.ainvoke([system_message, *messages])
 
         return {"messages": [response], "draft_answer": response.content}
 
-    def critique_node(state: ReflexionState) -> dict:
+    async def critique_node(state: ReflexionState) -> dict:
         """Evaluate the current answer."""
         draft = state.get("draft_answer", "")
         iteration = state.get("iteration", 0)
@@ -106,14 +124,18 @@ Try again with more thorough research and analysis."""
             HumanMessage(content="Please evaluate this answer."),
         ]
 
-        response = llm.invoke(messages)
+        response = await critique_llm.ainvoke(messages)
 
-        print("=" * 50)
-        print("Critique:")
-        print(response.content)
-        print("=" * 50)
+        report("\n".join(["=" * 50, "Critique:", response.content, "=" * 50]))
 
-        return {"critique": response.content, "iteration": iteration + 1}
+        update = {"critique": response.content, "iteration": iteration + 1}
+        # Only ask for a revision if the actor will get another turn; otherwise
+        # the finished thread would end on an unanswered request.
+        if not _is_good(response.content) and iteration + 1 < max_iterations:
+            update["messages"] = [
+                HumanMessage(content=REVISION_PROMPT.format(critique=response.content))
+            ]
+        return update
 
     def finalize_node(state: ReflexionState) -> dict:
         """Finalize the answer."""
@@ -130,7 +152,7 @@ Try again with more thorough research and analysis."""
         critique = state.get("critique", "")
         iteration = state.get("iteration", 0)
 
-        if "VERDICT: GOOD" in critique or iteration >= max_iterations:
+        if _is_good(critique) or iteration >= max_iterations:
             return "__end__"
 
         return "actor"
@@ -138,7 +160,7 @@ Try again with more thorough research and analysis."""
     graph = StateGraph(ReflexionState)
 
     graph.add_node("actor", actor_node)
-    graph.add_node("tools", tool_node)
+    graph.add_node("tools", create_tool_node(tools))
     graph.add_node("critique", critique_node)
     graph.add_node("finalize", finalize_node)
 
@@ -156,6 +178,6 @@ Try again with more thorough research and analysis."""
 
     graph.add_edge("finalize", END)
 
-    workflow = graph.compile()
-    workflow.get_graph().print_ascii()
+    workflow = graph.compile(checkpointer=checkpointer)
+    print_graph_if_debug(workflow)
     return workflow
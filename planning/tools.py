@@ -4,6 +4,9 @@ LangChain-compatible tool wrappers for SCGBridge methods.
 These tools wrap the SCGBridge functionality for use with LangGraph agents.
 """
 
+import asyncio
+import json
+from collections import OrderedDict
 from typing import List
 from langchain_core.tools import tool
 
@@ -11,6 +14,17 @@ from langchain_core.tools import tool
 from mcp import ClientSession
 
 
+TOOL_CACHE_SIZE = 4096
+MAX_TOOL_CHARS = 4000
+
+
+def _clip(text: str, max_chars: int = MAX_TOOL_CHARS) -> str:
+    """Truncate a tool result, noting how much was cut."""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + f"...[truncated {len(text) - max_chars} chars]"
+
+
 def create_scg_tools(session: ClientSession) -> list:
     """Create LangChain tools that wrap MCP client methods.
 
@@ -20,23 +34,42 @@ def create_scg_tools(session: ClientSession) -> list:
     Returns:
         List of LangChain tool functions
     """
-
-    @tool
-    def search_symbols(query: str, limit: int = 10) -> str:
-        """Search for code symbols (classes, methods, functions) matching the query.
-
-        Args:
-            query: Search query string (e.g., "cache manager", "parse json")
-            limit: Maximum number of results to return (default: 10)
-
-        Returns:
-            Formatted string with matching symbols and their metadata
-        """
-        try:
-            pass
-        except Exception as e:
-            return f"Error: {str(e)}"
-        return "Not implemented yet - need async wrapper"
+    # The code graph is read-only for the lifetime of a session, so repeated
+    # calls with the same arguments can be answered from memory.
+    cache: OrderedDict[str, str] = OrderedDict()
+    # Identical calls issued concurrently (e.g. overlapping LATS candidates)
+    # share one in-flight request instead of all missing the cache.
+    in_flight: dict[str, asyncio.Task] = {}
+
+    async def fetch(key: str, name: str, arguments: dict) -> str:
+        result = await session.call_tool(name, arguments=arguments)
+        # A server may split long output into several text blocks.
+        texts = [block.text for block in result.content if hasattr(block, "text")]
+        if not texts:
+            return "No content returned."
+        text = "\n".join(texts)
+        # Errors may be transient (timeouts, index still loading), so retry them.
+        # mcp 1.x names the flag isError, 2.x is_error.
+        if not (getattr(result, "is_error", None) or getattr(result, "isError", False)):
+            cache[key] = text
+            if len(cache) > TOOL_CACHE_SIZE:
+                cache.popitem(last=False)
+        return text
+
+    async def call_tool(name: str, arguments: dict) -> str:
+        # Full results are cached; only what is returned to the LLM is clipped.
+        key = json.dumps([name, arguments], sort_keys=True, separators=(",", ":"))
+        if key in cache:
+            cache.move_to_end(key)
+            return _clip(cache[key])
+
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch(key, name, arguments))
+            in_flight[key] = task
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the shared request.
+        return _clip(await asyncio.shield(task))
 
     @tool
     async def search_symbols(query: str, limit: int = 10) -> str:
@@ -49,12 +82,7 @@ def create_scg_tools(session: ClientSession) -> list:
         Returns:
             Formatted string with matching symbols and their metadata
         """
-        result = await session.call_tool(
-            "search_code", arguments={"query": query, "limit": limit}
-        )
-        if not result.content:
-            return "No content returned."
-        return result.content[0].text
+        return await call_tool("search_code", {"query": query, "limit": limit})
 
     @tool
     async def get_source_code(node_id: str, context_padding: int = 3) -> str:
@@ -67,13 +95,10 @@ def create_scg_tools(session: ClientSession) -> list:
         Returns:
             Source code string or error message if not found
         """
-        result = await session.call_tool(
+        return await call_tool(
             "get_node_source",
-            arguments={"node_id": node_id, "context_padding": context_padding},
+            {"node_id": node_id, "context_padding": context_padding},
         )
-        if not result.content:
-            return "No content returned."
-        return result.content[0].text
 
     @tool
     async def get_subgraph_context(node_ids: List[str], hops: int = 1) -> str:
@@ -86,12 +111,11 @@ def create_scg_tools(session: ClientSession) -> list:
         Returns:
             Human-readable context describing the subgraph
         """
-        result = await session.call_tool(
-            "get_node_context", arguments={"node_ids": node_ids, "hops": hops}
+        # Duplicate ids would make the server expand the same neighbourhood twice.
+        node_ids = list(dict.fromkeys(node_ids))
+        return await call_tool(
+            "get_node_context", {"node_ids": node_ids, "hops": hops}
         )
-        if not result.content:
-            return "No content returned."
-        return result.content[0].text
 
     @tool
     async def get_graph_stats() -> str:
@@ -100,9 +124,11 @@ def create_scg_tools(session: ClientSession) -> list:
         Returns:
             Formatted statistics about the code graph including node and edge counts.
         """
-        result = await session.call_tool("get_graph_stats", arguments={})
-        if not result.content:
-            return "No content returned."
-        return result.content[0].text
-
-    return [search_symbols, get_source_code, get_subgraph_context, get_graph_stats]
+        return await call_tool("get_graph_stats", {})
+
+    return [
+        search_symbols,
+        get_source_code,
+        get_subgraph_context,
+        get_graph_stats,
+    ]
@@ -1,11 +1,16 @@
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 
+SERVER_COMMAND = "uv"
+SERVER_ARGS = ("run", "python", "-m", "src.mcp_server")
+
+
 @asynccontextmanager
 async def create_mcp_client(cwd: Path | str) -> ClientSession:
     """
@@ -14,14 +19,59 @@ async def create_mcp_client(cwd: Path | str) -> ClientSession:
     Args:
         cwd: The working directory where the server command should run (scg-experiments root).
     """
+    # Built per start so the server sees the environment as it is now.
     server_params = StdioServerParameters(
-        command="uv",
-        args=["run", "python", "-m", "src.mcp_server"],
+        command=SERVER_COMMAND,
+        args=list(SERVER_ARGS),
         cwd=str(cwd),
-        env=dict(os.environ),
+        env=os.environ,
     )
 
     async with stdio_client(server_params) as (read, write):
         async with ClientSession(read, write) as session:
             await session.initialize()
             yield session
+
+
+_SESSION: ClientSession | None = None
+_EXIT_STACK: AsyncExitStack | None = None
+_SESSION_LOCK: asyncio.Lock | None = None
+
+
+def _session_lock() -> asyncio.Lock:
+    """Get the session lock, creating it under the running event loop."""
+    global _SESSION_LOCK
+
+    if _SESSION_LOCK is None:
+        _SESSION_LOCK = asyncio.Lock()
+    return _SESSION_LOCK
+
+
+async def get_session(cwd: Path | str) -> ClientSession:
+    """
+    Get the shared client session, starting the MCP server on first use.
+
+    The session stays open across calls until close_session() is awaited, which
+    must happen on the same task that opened it.
+
+    Args:
+        cwd: The working directory where the server command should run (scg-experiments root).
+    """
+    global _SESSION, _EXIT_STACK
+
+    async with _session_lock():
+        if _SESSION is None:
+            exit_stack = AsyncExitStack()
+            _SESSION = await exit_stack.enter_async_context(create_mcp_client(cwd))
+            _EXIT_STACK = exit_stack
+        return _SESSION
+
+
+async def close_session() -> None:
+    """Close the shared client session and stop the MCP server, if running."""
+    global _SESSION, _EXIT_STACK
+
+    async with _session_lock():
+        exit_stack, _SESSION, _EXIT_STACK = _EXIT_STACK, None, None
+        if exit_stack is not None:
+            await exit_stack.aclose()
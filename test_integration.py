@@ -25,23 +25,38 @@ async def test_bridge_integration():
             tools = await session.list_tools()
             print(f"   Available tools: {[t.name for t in tools.tools]}")
 
+            # The checks are independent, so run them concurrently and
+            # report in order: (heading, call, result formatter)
+            tool_names = {t.name for t in tools.tools}
+            checks = []
+
             # Test search (if tools available)
-            if any(t.name == "search_code" for t in tools.tools):
-                print("\n Testing search functionality...")
-                result = await session.call_tool(
-                    "search_code", arguments={"query": "cache", "limit": 3}
-                )
-                if result.content:
-                    print(
-                        f"   Search result preview:\n{result.content[0].text[:200]}..."
+            if "search_code" in tool_names:
+                checks.append(
+                    (
+                        "Testing search functionality...",
+                        session.call_tool(
+                            "search_code", arguments={"query": "cache", "limit": 3}
+                        ),
+                        lambda text: f"   Search result preview:\n{text[:200]}...",
                     )
+                )
 
             # Test graph stats
-            if any(t.name == "get_graph_stats" for t in tools.tools):
-                print("\n Testing graph stats...")
-                result = await session.call_tool("get_graph_stats", arguments={})
+            if "get_graph_stats" in tool_names:
+                checks.append(
+                    (
+                        "Testing graph stats...",
+                        session.call_tool("get_graph_stats", arguments={}),
+                        lambda text: f"   Stats:\n{text}",
+                    )
+                )
+
+            results = await asyncio.gather(*(call for _, call, _ in checks))
+            for (heading, _, describe), result in zip(checks, results):
+                print(f"\n {heading}")
                 if result.content:
-                    print(f"   Stats:\n{result.content[0].text}")
+                    print(describe(result.content[0].text))
 
         print("\n✅ All tests passed! Integration is working correctly.")
         return True
@@ -0,0 +1,54 @@
+"""Tests for the shared planning helpers."""
+
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from planning.base import window_messages
+
+
+def tool_round(n: int) -> list:
+    """An AIMessage making n parallel tool calls, followed by their results."""
+    calls = [
+        {"id": f"call_{i}", "name": "search_symbols", "args": {}} for i in range(n)
+    ]
+    results = [
+        ToolMessage(content=f"result {i}", tool_call_id=f"call_{i}") for i in range(n)
+    ]
+    return [AIMessage(content="", tool_calls=calls), *results]
+
+
+class WindowMessagesTest(unittest.TestCase):
+    def test_short_history_is_unchanged(self):
+        messages = [HumanMessage(content="q"), AIMessage(content="a")]
+        self.assertEqual(window_messages(messages, 5), messages)
+
+    def test_keeps_question_and_last_messages(self):
+        question = HumanMessage(content="q")
+        rest = [AIMessage(content=f"a{i}") for i in range(5)]
+        self.assertEqual(window_messages([question, *rest], 2), [question, *rest[-2:]])
+
+    def test_non_positive_window_keeps_only_question(self):
+        messages = [
+            HumanMessage(content="q"),
+            AIMessage(content="a1"),
+            HumanMessage(content="q2"),
+            AIMessage(content="a2"),
+        ]
+        self.assertEqual(window_messages(messages, 0), messages[:1])
+        self.assertEqual(window_messages(messages, -1), messages[:1])
+
+    def test_window_smaller_than_parallel_tool_results(self):
+        question = HumanMessage(content="q")
+        earlier = AIMessage(content="thinking")
+        tool_messages = tool_round(4)
+        messages = [question, earlier, *tool_messages]
+
+        windowed = window_messages(messages, 2)
+
+        # Widened back to the AIMessage that made the calls, not emptied.
+        self.assertEqual(windowed, [question, *tool_messages])
+
+
+if __name__ == "__main__":
+    unittest.main()